@@ -1,32 +1,56 @@
 import logging
 import os
-from io import BytesIO
-import boto3
 import joblib
 import streamlit as st
-from PIL import Image
-import numpy as np
-from sklearn.base import BaseEstimator
+from botocore.exceptions import BotoCoreError, ClientError
 import utils
 
 
 logging.basicConfig(level=logging.INFO)
-lambda_client = boto3.client("lambda", region_name="us-east-2")
 lambda_function_name = os.getenv(
     "LAMBDA_FUNCTION_NAME",
     "Inference-ImageProcess")
 bucket_name = os.getenv("BUCKET_NAME", "cloud-project-artifact")
+lambda_max_concurrency = int(os.getenv("LAMBDA_MAX_CONCURRENCY", "10"))
+metrics_port = int(os.getenv("METRICS_PORT", "9100"))
 
 
-# Define the emotion labels
-emotion_labels = [
-    "Angry",
-    "Disgust",
-    "Fear",
-    "Happy",
-    "Sad",
-    "Surprise",
-    "Neutral"]
+# Shared by all sessions so that the metrics cover every request served by this process
+@st.cache_resource
+def load_metrics():
+    """Create the inference metrics and serve them for Prometheus unless METRICS_PORT is 0.
+
+    Returns:
+    utils.InferenceMetrics: The shared inference metrics.
+    """
+    inference_metrics = utils.InferenceMetrics()
+    if metrics_port:
+        utils.start_metrics_server(inference_metrics, metrics_port)
+    return inference_metrics
+
+
+# Shared by all sessions so that connections are pooled and concurrency is bounded per process
+@st.cache_resource
+def load_lambda_invoker(_metrics):
+    """Create the Lambda invoker from the environment configuration.
+
+    Args:
+    _metrics (utils.InferenceMetrics): The metrics receiving the per-call latency as the "lambda_call" step;
+        the leading underscore keeps Streamlit from hashing it.
+
+    Returns:
+    utils.LambdaInvoker: The shared Lambda invoker.
+    """
+    client = utils.create_lambda_client(
+        region_name=os.getenv("AWS_REGION", "us-east-2"),
+        max_pool_connections=lambda_max_concurrency,
+        connect_timeout=float(os.getenv("LAMBDA_CONNECT_TIMEOUT", "2")),
+        read_timeout=float(os.getenv("LAMBDA_READ_TIMEOUT", "10")),
+        max_attempts=int(os.getenv("LAMBDA_MAX_ATTEMPTS", "3")),
+        endpoint_url=os.getenv("LAMBDA_ENDPOINT_URL"))
+    invoker = utils.LambdaInvoker(client, lambda_function_name, max_concurrency=lambda_max_concurrency,
+                                  latency_histogram=_metrics.histogram("lambda_call"))
+    return utils.replace_shared_invoker(invoker)
 
 
 # Load the trained model
@@ -67,6 +91,8 @@ st.subheader("Select an image source to proceed:", anchor=False)
 MODEL_VERSION = "Random Forest"
 
 model = load_model(MODEL_VERSION)
+metrics = load_metrics()
+lambda_invoker = load_lambda_invoker(metrics)
 image = None
 
 
@@ -82,36 +108,22 @@ if option == "Upload an Image":
         "Choose an image...", type=[
             "jpg", "jpeg", "png"])
     if uploaded_file is not None:
-        image = Image.open(uploaded_file)
+        image = utils.open_image(uploaded_file, metrics)
         st.image(image, caption="Uploaded Image.")
 
 elif option == "Capture from Webcam":
     img_file_buffer = st.camera_input("Take a picture")
 
     if img_file_buffer is not None:
-        image = Image.open(img_file_buffer)
-
-
-if image is not None:
-    encoded = utils.encode_image(image)
-    response = utils.invoke_lambda(
-        lambda_client, encoded, lambda_function_name)
-
-    if response["statusCode"] == 200:
-        decoded = utils.decode_image(response)
-        image = Image.open(BytesIO(decoded))
+        image = utils.open_image(img_file_buffer, metrics)
 
 
 if image is not None and model is not None:
-    logging.info("Making prediction")
-
-    if isinstance(model, BaseEstimator):
-        img_array = np.array(image).reshape(1, -1)
-        prediction = model.predict(img_array)[0]
-        predicted_emotion = emotion_labels[prediction]
+    try:
+        image, predicted_emotion = utils.infer_emotion(
+            image, lambda_invoker, model, utils.EMOTION_LABELS, metrics)
+    except (BotoCoreError, ClientError, utils.LambdaInvocationError) as invoke_error:
+        logging.error("Error invoking Lambda: %s", invoke_error)
+        st.error("The image could not be processed, please try again.")
     else:
-        img_array = np.array([image])
-        prediction = model.predict(img_array)
-        predicted_emotion = emotion_labels[np.argmax(prediction)]
-
-    st.subheader(f"The predicted emotion is: {predicted_emotion}")
+        st.subheader(f"The predicted emotion is: {predicted_emotion}")
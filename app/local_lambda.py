@@ -0,0 +1,101 @@
+"""Local stand-in for the Lambda Invoke endpoint and sample uploads, for running the inference path offline.
+
+Shared by the app unit tests and the benchmarks' load test, which point a boto3 client at a
+FakeLambdaServer through endpoint_url instead of calling AWS.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from PIL import Image
+
+
+def sample_image(size=(640, 480), seed=0):
+    """Build a random RGB image standing in for a user upload."""
+    rng = random.Random(seed)
+    return Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3))
+
+
+def sample_upload(size=(640, 480), seed=0):
+    """Return a random RGB PNG as the file object of a user upload."""
+    upload = BytesIO()
+    sample_image(size, seed).save(upload, format="PNG")
+    upload.seek(0)
+    return upload
+
+
+class FakeLambdaServer:
+    """Local HTTP endpoint speaking the Lambda Invoke API, for boto3 clients created with endpoint_url.
+
+    Runs `handler` on each invocation after an optional artificial `latency` in seconds. The first
+    `throttle_requests` calls are answered with a retryable TooManyRequestsException. Distinct client
+    connections are counted so that tests can check keep-alive reuse. Use as a context manager.
+    """
+
+    def __init__(self, handler, latency=0.0, throttle_requests=0):
+        self.handler = handler
+        self.latency = latency
+        self.throttle_requests = throttle_requests
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._request_handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint_url(self):
+        """The URL to pass as endpoint_url to the boto3 Lambda client."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _request_handler_class(self):
+        fake = self
+
+        class InvokeRequestHandler(BaseHTTPRequestHandler):
+            """Handle POST /2015-03-31/functions/<name>/invocations over kept-alive connections."""
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake._lock:  # pylint: disable=protected-access
+                    fake.connections += 1
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                """Invoke the handler with the JSON payload, or throttle the request."""
+                payload = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:  # pylint: disable=protected-access
+                    fake.requests += 1
+                    throttle = fake.requests <= fake.throttle_requests
+                if throttle:
+                    self._respond(429, {"Type": "User", "message": "Rate exceeded"},
+                                  {"x-amzn-ErrorType": "TooManyRequestsException"})
+                    return
+                if fake.latency:
+                    time.sleep(fake.latency)
+                self._respond(200, fake.handler(json.loads(payload), None), {})
+
+            def _respond(self, status, body, headers):
+                encoded = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                """Silence per-request logging."""
+
+        return InvokeRequestHandler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
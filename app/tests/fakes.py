@@ -0,0 +1,14 @@
+"""Handler stubs for the app unit tests."""
+import base64
+import json
+from io import BytesIO
+from PIL import Image
+
+
+def preprocess_handler(event, _context):
+    """Stub of the inference preprocessing Lambda: return the image as a 48x48 grayscale PNG."""
+    image = Image.open(BytesIO(base64.b64decode(event["image_data"]))).convert("L").resize((48, 48))
+    buffered = BytesIO()
+    image.save(buffered, format="PNG")
+    standardized_image_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    return {"statusCode": 200, "body": json.dumps({"standardized_image_data": standardized_image_data})}
@@ -0,0 +1,199 @@
+import os
+import socket
+import unittest
+import urllib.request
+from unittest.mock import patch
+import numpy as np
+from botocore.exceptions import ClientError
+from sklearn.dummy import DummyClassifier
+from utils import (EMOTION_LABELS, InferenceMetrics, LambdaInvocationError, LambdaInvoker, LatencyHistogram,
+                   create_lambda_client, infer_emotion, open_image, replace_shared_invoker, start_metrics_server,
+                   stop_metrics_server)
+from local_lambda import FakeLambdaServer, sample_upload
+from tests.fakes import preprocess_handler
+
+FAKE_CREDENTIALS = {"AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing"}
+
+
+def echo_handler(event, _context):
+    """Return the received image data unchanged, like a successful preprocessing Lambda."""
+    return {"statusCode": 200, "body": event["image_data"]}
+
+
+def scrape(port):
+    """Fetch the metrics text served on the local port."""
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        return response.read().decode("utf-8")
+
+
+@patch.dict(os.environ, FAKE_CREDENTIALS)
+class TestLambdaInvoker(unittest.TestCase):
+    """
+    Test suite for create_lambda_client and LambdaInvoker against a local fake Lambda endpoint.
+    """
+
+    def test_invoke_returns_payload_and_records_latency(self):
+        """Test that invoke returns the Lambda payload and records one latency per call."""
+        with FakeLambdaServer(echo_handler) as server:
+            client = create_lambda_client(endpoint_url=server.endpoint_url)
+            invoker = LambdaInvoker(client, "test-function")
+            response = invoker.invoke("abc")
+            invoker.shutdown()
+        self.assertEqual(response, {"statusCode": 200, "body": "abc"})
+        self.assertEqual(invoker.latency_summary()["count"], 1)
+
+    def test_invoke_many_bounded_and_pooled(self):
+        """Test that concurrent calls preserve order and reuse at most max_concurrency connections."""
+        with FakeLambdaServer(echo_handler, latency=0.02) as server:
+            client = create_lambda_client(endpoint_url=server.endpoint_url, max_pool_connections=4)
+            invoker = LambdaInvoker(client, "test-function", max_concurrency=4)
+            images = [str(i) for i in range(20)]
+            responses = invoker.invoke_many(images)
+            invoker.shutdown()
+        self.assertEqual([response["body"] for response in responses], images)
+        self.assertLessEqual(server.connections, 4)
+        self.assertEqual(invoker.latency.snapshot()["count"], 20)
+
+    def test_invoke_retries_throttled_calls(self):
+        """Test that throttled calls are retried up to max_attempts."""
+        with FakeLambdaServer(echo_handler, throttle_requests=2) as server:
+            client = create_lambda_client(endpoint_url=server.endpoint_url, max_attempts=3)
+            invoker = LambdaInvoker(client, "test-function")
+            response = invoker.invoke("abc")
+            invoker.shutdown()
+        self.assertEqual(response["statusCode"], 200)
+        self.assertEqual(server.requests, 3)
+
+    def test_invoke_raises_when_retries_exhausted(self):
+        """Test that a ClientError is raised once all attempts are throttled."""
+        with FakeLambdaServer(echo_handler, throttle_requests=5) as server:
+            client = create_lambda_client(endpoint_url=server.endpoint_url, max_attempts=2)
+            invoker = LambdaInvoker(client, "test-function")
+            with self.assertRaises(ClientError):
+                invoker.invoke("abc")
+            invoker.shutdown()
+        self.assertEqual(server.requests, 2)
+
+    def test_replace_shared_invoker_shuts_down_previous(self):
+        """Test that replacing the shared invoker releases the old one and keeps the new one usable."""
+        with FakeLambdaServer(echo_handler) as server:
+            client = create_lambda_client(endpoint_url=server.endpoint_url)
+            first = replace_shared_invoker(LambdaInvoker(client, "test-function"))
+            second = replace_shared_invoker(LambdaInvoker(client, "test-function"))
+            with self.assertRaises(RuntimeError):
+                first.invoke("abc")
+            self.assertEqual(second.invoke("abc")["body"], "abc")
+            second.shutdown()
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """
+    Test suite for LatencyHistogram.
+    """
+
+    def test_cumulative_buckets_and_quantiles(self):
+        """Test that observations land in cumulative buckets and quantiles use bucket bounds."""
+        histogram = LatencyHistogram(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.05, 0.5, 2.0):
+            histogram.observe(seconds)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["buckets"], [(0.1, 2), (1.0, 3), (float("inf"), 4)])
+        self.assertAlmostEqual(snapshot["sum"], 2.6)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.75), 1.0)
+
+
+class TestInferenceMetrics(unittest.TestCase):
+    """
+    Test suite for InferenceMetrics, start_metrics_server and the timed inference path.
+    """
+
+    def test_time_step_counts_errors(self):
+        """Test that a failing step is both timed and counted as an error."""
+        metrics = InferenceMetrics()
+        with self.assertRaises(ValueError):
+            with metrics.time_step("lambda"):
+                raise ValueError("test error")
+        summary = metrics.summary()["lambda"]
+        self.assertEqual(summary["count"], 1)
+        self.assertEqual(summary["errors"], 1)
+
+    def test_metrics_server_serves_prometheus_text(self):
+        """Test that /metrics returns histograms and error counters in the Prometheus format."""
+        metrics = InferenceMetrics(buckets=(0.1,))
+        metrics.histogram("predict").observe(0.05)
+        server = start_metrics_server(metrics, port=0, host="127.0.0.1")
+        try:
+            body = scrape(server.server_address[1])
+        finally:
+            stop_metrics_server()
+        self.assertIn("# TYPE inference_step_duration_seconds histogram", body)
+        self.assertIn('inference_step_duration_seconds_bucket{step="predict",le="0.1"} 1', body)
+        self.assertIn('inference_step_duration_seconds_bucket{step="predict",le="+Inf"} 1', body)
+        self.assertIn('inference_step_duration_seconds_count{step="predict"} 1', body)
+        self.assertIn('inference_step_errors_total{step="predict"} 0', body)
+
+    def test_metrics_server_restart_reuses_port(self):
+        """Test that starting the server again on its port swaps the metrics instead of rebinding."""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        first, second = InferenceMetrics(), InferenceMetrics()
+        second.histogram("lambda").observe(0.05)
+        try:
+            server = start_metrics_server(first, port=port, host="127.0.0.1")
+            self.assertIs(start_metrics_server(second, port=port, host="127.0.0.1"), server)
+            self.assertIn('step="lambda"', scrape(port))
+        finally:
+            stop_metrics_server()
+
+    def test_metrics_server_port_in_use(self):
+        """Test that a port held by another process is logged instead of raising."""
+        with socket.socket() as blocker:
+            blocker.bind(("127.0.0.1", 0))
+            blocker.listen()
+            port = blocker.getsockname()[1]
+            with self.assertLogs(level="ERROR"):
+                self.assertIsNone(start_metrics_server(InferenceMetrics(), port=port, host="127.0.0.1"))
+
+    @patch.dict(os.environ, FAKE_CREDENTIALS)
+    def test_infer_emotion_times_every_step(self):
+        """Test that the inference path predicts on the preprocessed image and times each step."""
+        model = DummyClassifier(strategy="constant", constant=3).fit(np.zeros((1, 48 * 48)), [3])
+        metrics = InferenceMetrics()
+        with FakeLambdaServer(preprocess_handler) as server:
+            invoker = LambdaInvoker(create_lambda_client(endpoint_url=server.endpoint_url), "test-function")
+            image = open_image(sample_upload(size=(64, 64)), metrics)
+            processed, predicted_emotion = infer_emotion(image, invoker, model, EMOTION_LABELS, metrics)
+            invoker.shutdown()
+        self.assertEqual(predicted_emotion, "Happy")
+        self.assertEqual(processed.size, (48, 48))
+        self.assertEqual(
+            set(metrics.summary()),
+            {"image_decode", "encode_image", "lambda", "decode_image", "predict", "total"}
+        )
+
+    @patch.dict(os.environ, FAKE_CREDENTIALS)
+    def test_infer_emotion_fails_lambda_step_without_success_status(self):
+        """Test that an error status or an unhandled error payload raises and counts a "lambda" error."""
+        model = DummyClassifier(strategy="constant", constant=3).fit(np.zeros((1, 48 * 48)), [3])
+        failures = {
+            "error status": {"statusCode": 500, "body": "Error processing the image"},
+            "missing status": {"errorMessage": "Task timed out", "errorType": "TimeoutError"},
+        }
+        for name, payload in failures.items():
+            with self.subTest(name):
+                metrics = InferenceMetrics()
+                with FakeLambdaServer(lambda event, _context, payload=payload: payload) as server:
+                    invoker = LambdaInvoker(create_lambda_client(endpoint_url=server.endpoint_url), "test-function")
+                    image = open_image(sample_upload(size=(64, 64)), metrics)
+                    with self.assertRaises(LambdaInvocationError):
+                        infer_emotion(image, invoker, model, EMOTION_LABELS, metrics)
+                    invoker.shutdown()
+                summary = metrics.summary()
+                self.assertEqual(summary["lambda"]["errors"], 1)
+                self.assertNotIn("predict", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
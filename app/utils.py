@@ -1,12 +1,29 @@
 import json
 import base64
+import bisect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from io import BytesIO
 import logging
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
 from PIL import Image
 import boto3
+from botocore.config import Config
+import numpy as np
+from sklearn.base import BaseEstimator
 
 logging.basicConfig(level=logging.INFO)
 
+# The emotion labels indexed by the model's predicted class
+EMOTION_LABELS = ["Angry", "Disgust", "Fear", "Happy", "Sad", "Surprise", "Neutral"]
+
+
+class LambdaInvocationError(Exception):
+    """Raised when the preprocessing Lambda function answers without a successful status code."""
+
 
 def download_model(bucket_name: str, s3_key: str, local_path: str) -> None:
     """Download a model file from an S3 bucket to a local path.
@@ -70,6 +87,173 @@ def invoke_lambda(client: boto3.client, image_data: str, lambda_function_name: s
     return response_payload
 
 
+# Upper bounds in seconds of the latency histogram buckets; a final +Inf bucket is implied
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Thread-safe histogram of call latencies with cumulative buckets, as in Prometheus."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency in seconds."""
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """Return the cumulative bucket counts, total count and sum of the recorded latencies.
+
+        Returns:
+        dict: {"buckets": [(upper_bound, cumulative_count), ...], "count": int, "sum": float}
+        """
+        with self._lock:
+            counts, total, latency_sum = list(self._counts), self._count, self._sum
+        cumulative, running = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "count": total, "sum": latency_sum}
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile as the upper bound of the bucket it falls in."""
+        snapshot = self.snapshot()
+        if snapshot["count"] == 0:
+            return float("nan")
+        rank = q * snapshot["count"]
+        for bound, cumulative in snapshot["buckets"]:
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+
+def create_lambda_client(region_name: str = "us-east-2",
+                         max_pool_connections: int = 10,
+                         connect_timeout: float = 2.0,
+                         read_timeout: float = 10.0,
+                         max_attempts: int = 3,
+                         retry_mode: str = "standard",
+                         endpoint_url: Optional[str] = None) -> boto3.client:
+    """Create a boto3 Lambda client with an explicitly sized, keep-alive connection pool.
+
+    Parameters:
+    region_name (str): The AWS region of the Lambda function.
+    max_pool_connections (int): The maximum number of pooled HTTP connections.
+    connect_timeout (float): Seconds to wait for a connection to be established.
+    read_timeout (float): Seconds to wait for the Lambda response.
+    max_attempts (int): Total attempts per call, including the first one.
+    retry_mode (str): The botocore retry mode; "standard" and "adaptive" back off exponentially with jitter.
+    endpoint_url (str): Optional endpoint overriding AWS, e.g. a local fake Lambda endpoint.
+
+    Returns:
+    boto3.client: The configured Lambda client.
+    """
+    config = Config(
+        max_pool_connections=max_pool_connections,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries={"total_max_attempts": max_attempts, "mode": retry_mode},
+        tcp_keepalive=True,
+    )
+    return boto3.client("lambda", region_name=region_name, endpoint_url=endpoint_url, config=config)
+
+
+class LambdaInvoker:
+    """Invoke a Lambda function through a shared client with bounded concurrency and latency tracking.
+
+    Calls run on a thread pool of max_concurrency workers, so no more than that many requests
+    are in flight at once however many sessions share the invoker; extra calls wait in the queue.
+    The pool should not be larger than the client's max_pool_connections, so that every worker
+    can reuse a kept-alive connection.
+    """
+
+    def __init__(self, client: boto3.client, lambda_function_name: str, max_concurrency: int = 10,
+                 latency_histogram: Optional[LatencyHistogram] = None):
+        self.client = client
+        self.lambda_function_name = lambda_function_name
+        self.latency = latency_histogram or LatencyHistogram()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="lambda-invoke")
+
+    def _timed_invoke(self, image_data: str) -> dict:
+        start = time.perf_counter()
+        try:
+            return invoke_lambda(self.client, image_data, self.lambda_function_name)
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+
+    def submit(self, image_data: str) -> Future:
+        """Queue an invocation and return a Future of the response payload."""
+        return self._executor.submit(self._timed_invoke, image_data)
+
+    def invoke(self, image_data: str, timeout: Optional[float] = None) -> dict:
+        """Invoke the Lambda function and wait for the response payload.
+
+        Parameters:
+        image_data (str): The base64 encoded image data to be sent to the Lambda function.
+        timeout (float): Optional seconds to wait, including time queued behind other calls.
+
+        Returns:
+        dict: The response payload from the Lambda function.
+        """
+        return self.submit(image_data).result(timeout=timeout)
+
+    def invoke_many(self, images_data: Sequence[str]) -> List[dict]:
+        """Invoke the Lambda function concurrently for several images, preserving their order."""
+        futures = [self.submit(image_data) for image_data in images_data]
+        return [future.result() for future in futures]
+
+    def latency_summary(self) -> Dict[str, float]:
+        """Return the call count and estimated p50, p95 and p99 latencies in seconds."""
+        return {
+            "count": self.latency.snapshot()["count"],
+            "p50": self.latency.quantile(0.5),
+            "p95": self.latency.quantile(0.95),
+            "p99": self.latency.quantile(0.99),
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Release the worker threads once queued calls have finished; new calls are refused.
+
+        Parameters:
+        wait (bool): Whether to block until the queued calls have finished.
+        """
+        self._executor.shutdown(wait=wait)
+
+
+# One shared invoker per process; Streamlit reruns the app script but keeps imported modules
+_shared_invoker: Optional[LambdaInvoker] = None
+_shared_invoker_lock = threading.Lock()
+
+
+def replace_shared_invoker(invoker: LambdaInvoker) -> LambdaInvoker:
+    """Make the invoker the process's shared one, shutting down the invoker it replaces.
+
+    Streamlit builds a new invoker when its resource cache is cleared; without this the old
+    invoker's worker threads would stay alive for the life of the process. Calls already queued
+    on the old invoker still complete.
+
+    Parameters:
+    invoker (LambdaInvoker): The newly created invoker.
+
+    Returns:
+    LambdaInvoker: The same invoker, for chaining.
+    """
+    global _shared_invoker  # pylint: disable=global-statement
+    with _shared_invoker_lock:
+        previous, _shared_invoker = _shared_invoker, invoker
+    if previous is not None and previous is not invoker:
+        previous.shutdown(wait=False)
+    return invoker
+
+
 def decode_image(response: dict) -> bytes:
     """Decode the base64 encoded image data from the Lambda response.
 
@@ -82,3 +266,225 @@ def decode_image(response: dict) -> bytes:
     logging.info("Decoding image")
     encoded = json.loads(response["body"])["standardized_image_data"]
     return base64.b64decode(encoded)
+
+
+def predict_emotion(model, image: Image.Image, emotion_labels: Sequence[str]) -> str:
+    """Predict the emotion label of a preprocessed image.
+
+    Parameters:
+    model: The loaded model, either a scikit-learn estimator or a model returning class scores.
+    image (Image.Image): The preprocessed 48x48 grayscale image.
+    emotion_labels (Sequence[str]): The emotion labels indexed by class.
+
+    Returns:
+    str: The predicted emotion label.
+    """
+    logging.info("Making prediction")
+
+    if isinstance(model, BaseEstimator):
+        img_array = np.array(image).reshape(1, -1)
+        prediction = model.predict(img_array)[0]
+        return emotion_labels[prediction]
+
+    img_array = np.array([image])
+    prediction = model.predict(img_array)
+    return emotion_labels[np.argmax(prediction)]
+
+
+class InferenceMetrics:
+    """Per-step latency histograms and error counts of the inference path, rendered for Prometheus.
+
+    The steps timed by the app are "image_decode", "encode_image", "lambda", "decode_image",
+    "predict" and "total"; any other step name gets its own histogram on first use. The app also
+    hands the "lambda_call" histogram to its LambdaInvoker, which records the call alone, without
+    the time spent queued behind other sessions' calls that "lambda" includes.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.steps: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, step: str) -> LatencyHistogram:
+        """Return the histogram of a step, creating it on first use."""
+        with self._lock:
+            if step not in self.steps:
+                self.steps[step] = LatencyHistogram(self.buckets)
+                self.errors[step] = 0
+            return self.steps[step]
+
+    @contextmanager
+    def time_step(self, step: str) -> Iterator[None]:
+        """Time the enclosed block as one observation of the step, counting it as an error if it raises."""
+        histogram = self.histogram(step)
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self.errors[step] += 1
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return the count, errors, mean and estimated p50/p95 latency in seconds of every step."""
+        result = {}
+        for step, histogram in list(self.steps.items()):
+            snapshot = histogram.snapshot()
+            result[step] = {
+                "count": snapshot["count"],
+                "errors": self.errors[step],
+                "mean": snapshot["sum"] / snapshot["count"] if snapshot["count"] else float("nan"),
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+            }
+        return result
+
+    def render_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP inference_step_duration_seconds Duration of each step of the inference path.",
+            "# TYPE inference_step_duration_seconds histogram",
+        ]
+        for step, histogram in sorted(self.steps.items()):
+            snapshot = histogram.snapshot()
+            for bound, count in snapshot["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'inference_step_duration_seconds_bucket{{step="{step}",le="{le}"}} {count}')
+            lines.append(f'inference_step_duration_seconds_sum{{step="{step}"}} {snapshot["sum"]}')
+            lines.append(f'inference_step_duration_seconds_count{{step="{step}"}} {snapshot["count"]}')
+        lines.append("# HELP inference_step_errors_total Number of failed executions of each inference step.")
+        lines.append("# TYPE inference_step_errors_total counter")
+        for step, errors in sorted(self.errors.items()):
+            lines.append(f'inference_step_errors_total{{step="{step}"}} {errors}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Answer Prometheus scrapes with the metrics currently attached to the server."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Return the metrics on /metrics and 404 elsewhere."""
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Silence per-scrape logging."""
+
+
+# One metrics server per process; Streamlit reruns the app script but keeps imported modules
+_metrics_server: Optional[ThreadingHTTPServer] = None
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server(metrics: InferenceMetrics, port: int,
+                         host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve the metrics on GET /metrics from a background thread, once per process.
+
+    Calling it again for the same address, e.g. after Streamlit's resource cache was cleared,
+    points the running server at the new metrics instead of binding the port a second time.
+    A server on a different address is shut down first.
+
+    Parameters:
+    metrics (InferenceMetrics): The metrics to expose.
+    port (int): The port to listen on; 0 picks a free port.
+    host (str): The interface to bind to.
+
+    Returns:
+    ThreadingHTTPServer: The running server, or None if the port could not be bound.
+    """
+    global _metrics_server  # pylint: disable=global-statement
+    with _metrics_server_lock:
+        if _metrics_server is not None and port and _metrics_server.requested_address == (host, port):
+            _metrics_server.metrics = metrics
+            return _metrics_server
+        _stop_metrics_server()
+        try:
+            server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        except OSError as e:
+            logging.error("Could not serve metrics on port %d: %s", port, e)
+            return None
+        server.daemon_threads = True
+        server.metrics = metrics
+        server.requested_address = (host, port)
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        _metrics_server = server
+    logging.info("Serving metrics on port %d", server.server_address[1])
+    return server
+
+
+def stop_metrics_server() -> None:
+    """Shut down the process's metrics server, if one is running."""
+    with _metrics_server_lock:
+        _stop_metrics_server()
+
+
+def _stop_metrics_server() -> None:
+    global _metrics_server  # pylint: disable=global-statement
+    if _metrics_server is not None:
+        _metrics_server.shutdown()
+        _metrics_server.server_close()
+        _metrics_server = None
+
+
+def open_image(file: BinaryIO, metrics: InferenceMetrics) -> Image.Image:
+    """Open and fully decode an uploaded image, timed as the "image_decode" step.
+
+    Parameters:
+    file (BinaryIO): The uploaded image file.
+    metrics (InferenceMetrics): The metrics recording the step duration.
+
+    Returns:
+    Image.Image: The decoded image.
+    """
+    with metrics.time_step("image_decode"):
+        image = Image.open(file)
+        image.load()
+    return image
+
+
+def infer_emotion(image: Image.Image, invoker: LambdaInvoker, model, emotion_labels: Sequence[str],
+                  metrics: InferenceMetrics) -> Tuple[Image.Image, str]:
+    """Preprocess an image with the Lambda function and predict its emotion, timing every step.
+
+    A Lambda response without a 200 status code, including an unhandled error payload that has
+    no status at all, fails the "lambda" step: it is counted as an error of that step and raised.
+
+    Parameters:
+    image (Image.Image): The decoded uploaded image.
+    invoker (LambdaInvoker): The invoker of the preprocessing Lambda function.
+    model: The loaded model.
+    emotion_labels (Sequence[str]): The emotion labels indexed by class.
+    metrics (InferenceMetrics): The metrics recording the step durations.
+
+    Returns:
+    tuple: The preprocessed image the prediction was made on and the predicted emotion label.
+
+    Raises:
+    LambdaInvocationError: If the Lambda function did not succeed.
+    """
+    with metrics.time_step("total"):
+        with metrics.time_step("encode_image"):
+            encoded = encode_image(image)
+        with metrics.time_step("lambda"):
+            response = invoker.invoke(encoded)
+            status_code = response.get("statusCode") if isinstance(response, dict) else None
+            if status_code != 200:
+                raise LambdaInvocationError(f"Lambda function returned status {status_code}: {response}")
+
+        with metrics.time_step("decode_image"):
+            image = Image.open(BytesIO(decode_image(response)))
+            image.load()
+
+        with metrics.time_step("predict"):
+            predicted_emotion = predict_emotion(model, image, emotion_labels)
+    return image, predicted_emotion
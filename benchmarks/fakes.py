@@ -0,0 +1,70 @@
+"""In-process stand-ins for the AWS services used by the handlers, so benchmarks run without AWS.
+
+Importing this module also puts `app/` on the import path, so that the benchmarks exercise the app's
+own `utils` and reuse its local Lambda endpoint and sample uploads from `local_lambda`.
+"""
+import base64
+import importlib.util
+import io
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+AUGMENT_LAMBDA_PATH = REPO_ROOT / "preprocessing_lambda" / "lambda.py"
+INFERENCE_LAMBDA_PATH = REPO_ROOT / "preprocessing_lambda_inference" / "lambda_function.py"
+APP_DIR = REPO_ROOT / "app"
+
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+
+class FakeS3Client:
+    """Minimal in-memory replacement for the boto3 S3 client methods the Lambdas call."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+
+    def get_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        """Return the stored object body as a readable stream."""
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body):  # pylint: disable=invalid-name
+        """Store an object body, encoding text to bytes like S3 does."""
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+        self.objects[(Bucket, Key)] = Body
+        return {}
+
+
+class FakeLambdaClient:
+    """Replacement for the boto3 Lambda client that runs a handler in-process."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def invoke(self, FunctionName, InvocationType, Payload):  # pylint: disable=invalid-name,unused-argument
+        """Run the handler on the JSON payload and return its result as a readable stream."""
+        response = self.handler(json.loads(Payload), None)
+        return {"StatusCode": 200, "Payload": io.BytesIO(json.dumps(response).encode("utf-8"))}
+
+
+def load_module(path, name=None):
+    """Import a module from a file path; needed because `lambda.py` is not an importable name."""
+    name = name or f"{Path(path).parent.name}_handler"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def s3_put_event(bucket, key):
+    """Build the S3 ObjectCreated event the augmentation Lambda is triggered with."""
+    return {"Records": [{"s3": {"bucket": {"name": bucket}, "object": {"key": key}}}]}
+
+
+def sample_image_event(size=(640, 480), seed=0):
+    """Build an inference Lambda event carrying a random RGB PNG encoded as base64."""
+    # Imported here so that timing a handler's cold import also counts loading PIL
+    from local_lambda import sample_upload  # pylint: disable=import-outside-toplevel
+    return {"image_data": base64.b64encode(sample_upload(size, seed).getvalue()).decode("utf-8")}
@@ -0,0 +1,116 @@
+"""Measure cold-init time and warm-invocation latency of the Lambda handlers locally.
+
+Each cold sample runs in a fresh interpreter, timing the module import (the Lambda init phase)
+and the first invocation separately. Warm samples reuse one loaded module, as a warm container does.
+S3 is replaced by an in-memory fake, so no AWS access is needed.
+
+Usage:
+    python benchmarks/lambda_startup.py --cold-runs 5 --warm-runs 50 --output lambda_startup.json
+"""
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import time
+import fakes
+from report import positive_int, summarize, write_report
+from synthetic_fer import fer_csv
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HANDLERS = ("augment", "inference")
+HEAVY_MODULES = ("numpy", "boto3", "botocore")
+AUGMENT_ROWS = 20
+
+
+def prepare_invocation(handler_name, module):
+    """Return a zero-argument callable that invokes the loaded handler with a local event."""
+    if handler_name == "augment":
+        s3_client = fakes.FakeS3Client({("raw", "train.csv"): fer_csv(AUGMENT_ROWS).encode("utf-8")})
+        module.get_s3_client = lambda: s3_client
+        event = fakes.s3_put_event("raw", "train.csv")
+    else:
+        event = fakes.sample_image_event()
+
+    def invoke():
+        response = module.lambda_handler(event, None)
+        if response["statusCode"] != 200:
+            raise RuntimeError(f"{handler_name} handler failed: {response['body']}")
+        return response
+
+    return invoke
+
+
+def handler_path(handler_name):
+    """Return the source file of the named handler."""
+    return fakes.AUGMENT_LAMBDA_PATH if handler_name == "augment" else fakes.INFERENCE_LAMBDA_PATH
+
+
+def cold_sample(handler_name):
+    """Run in a fresh interpreter: time the import and the first invocation of a handler."""
+    start = time.perf_counter()
+    module = fakes.load_module(handler_path(handler_name))
+    init_ms = (time.perf_counter() - start) * 1000
+    loaded_at_init = [name for name in HEAVY_MODULES if name in sys.modules]
+    invoke = prepare_invocation(handler_name, module)
+    start = time.perf_counter()
+    invoke()
+    first_invoke_ms = (time.perf_counter() - start) * 1000
+    return {"init_ms": init_ms, "first_invoke_ms": first_invoke_ms, "heavy_modules_at_init": loaded_at_init}
+
+
+def benchmark_handler(handler_name, cold_runs, warm_runs):
+    """Collect cold samples in subprocesses and warm samples in this process."""
+    cold = []
+    for _ in range(cold_runs):
+        result = subprocess.run(
+            [sys.executable, __file__, "--cold-sample", handler_name],
+            check=True, capture_output=True, text=True
+        )
+        cold.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    invoke = prepare_invocation(handler_name, fakes.load_module(handler_path(handler_name)))
+    invoke()
+    warm = []
+    for _ in range(warm_runs):
+        start = time.perf_counter()
+        invoke()
+        warm.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "cold_init": summarize([sample["init_ms"] for sample in cold]),
+        "cold_first_invoke": summarize([sample["first_invoke_ms"] for sample in cold]),
+        "heavy_modules_at_init": cold[0]["heavy_modules_at_init"],
+        "warm_invoke": summarize(warm),
+    }
+
+
+def main():
+    """Parse arguments, run the benchmarks and write the JSON report."""
+    parser = argparse.ArgumentParser(description="Benchmark Lambda cold-init and warm-invocation latency.")
+    parser.add_argument("--handlers", nargs="+", choices=HANDLERS, default=list(HANDLERS))
+    parser.add_argument("--cold-runs", type=positive_int, default=5, help="Fresh-interpreter samples per handler")
+    parser.add_argument("--warm-runs", type=positive_int, default=50, help="Warm invocations per handler")
+    parser.add_argument("--output", default=None, help="Optional path of the JSON report")
+    parser.add_argument("--cold-sample", choices=HANDLERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_sample:
+        print(json.dumps(cold_sample(args.cold_sample)))
+        return
+
+    report = {name: benchmark_handler(name, args.cold_runs, args.warm_runs) for name in args.handlers}
+    for name, result in report.items():
+        logger.info(
+            "%s: init p50 %.1f ms, first invoke p50 %.1f ms, warm p50 %.2f ms / p95 %.2f ms, heavy imports %s",
+            name, result["cold_init"]["p50_ms"], result["cold_first_invoke"]["p50_ms"],
+            result["warm_invoke"]["p50_ms"], result["warm_invoke"]["p95_ms"], result["heavy_modules_at_init"] or "none"
+        )
+    if args.output:
+        write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Load test of the app's inference path with the preprocessing Lambda stubbed locally.
+
+Simulated users each run the same steps as a Streamlit session: decode the upload, encode it,
+invoke the Lambda through the shared LambdaInvoker, decode the response and predict. The Lambda is
+the real inference handler served by a local fake endpoint with an optional added latency, so the
+connection pool, concurrency bound and retries behave as against AWS. Throughput, end-to-end
+latency percentiles and the per-step breakdown from the app's InferenceMetrics are reported.
+
+Usage:
+    python benchmarks/load_test.py --users 16 --requests 500 --lambda-latency 0.05 --output load_test.json
+"""
+import argparse
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import fakes
+from report import positive_int, summarize, write_report
+from synthetic_fer import fer_rows
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from sklearn.ensemble import RandomForestClassifier
+import utils as app_utils
+from local_lambda import FakeLambdaServer, sample_upload
+
+logger = logging.getLogger("load_test")
+logger.setLevel(logging.INFO)
+logging.getLogger("report").setLevel(logging.INFO)
+
+NUM_DISTINCT_UPLOADS = 8
+
+
+def synthetic_model(rows=500):
+    """Train a small Random Forest on synthetic FER rows, standing in for the trained model."""
+    rows = list(fer_rows(rows))
+    x_data = [list(map(int, pixels.split())) for _, pixels in rows]
+    y_data = [emotion for emotion, _ in rows]
+    return RandomForestClassifier(n_estimators=50, random_state=42).fit(x_data, y_data)
+
+
+def run_load(invoker, model, metrics, uploads, users, requests):
+    """Drive `requests` inference requests from `users` concurrent threads; return latencies and errors."""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def user():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            start = time.perf_counter()
+            try:
+                image = app_utils.open_image(io.BytesIO(uploads[index % len(uploads)]), metrics)
+                app_utils.infer_emotion(image, invoker, model, app_utils.EMOTION_LABELS, metrics)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Any failure counts against the request, so that a user thread never dies silently
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        futures = [executor.submit(user) for _ in range(users)]
+    for future in futures:
+        future.result()
+    return latencies, errors
+
+
+def parse_args():
+    """Parse the command line arguments of the load test."""
+    parser = argparse.ArgumentParser(description="Load test the inference path with a local Lambda stub.")
+    parser.add_argument("--users", type=positive_int, default=8, help="Concurrent simulated users")
+    parser.add_argument("--requests", type=positive_int, default=200, help="Total inference requests")
+    parser.add_argument("--lambda-latency", type=float, default=0.05,
+                        help="Seconds added to each stubbed Lambda call to model network and invocation time")
+    parser.add_argument("--max-concurrency", type=positive_int, default=10,
+                        help="Invoker pool size, as LAMBDA_MAX_CONCURRENCY")
+    parser.add_argument("--image-size", type=positive_int, nargs=2, default=(640, 480), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--model", default=None, help="Path of a joblib model; a synthetic one is trained otherwise")
+    parser.add_argument("--output", default=None, help="Optional path of the JSON report")
+    parser.add_argument("--print-metrics", action="store_true", help="Print the Prometheus metrics at the end")
+    return parser.parse_args()
+
+
+def build_report(args, latencies, errors, elapsed, connections, metrics):
+    """Assemble throughput, latency percentiles and the per-step breakdown into a report."""
+    return {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "print_metrics")},
+        "completed": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else float("nan"),
+        "latency": summarize([seconds * 1000 for seconds in latencies], quantiles=(0.5, 0.9, 0.95, 0.99)),
+        "lambda_connections": connections,
+        "steps": metrics.summary(),
+    }
+
+
+def log_report(report):
+    """Log a summary of the load test report."""
+    logger.info("%d requests from %d users in %.2f s: %.1f req/s, %d errors, %d Lambda connections",
+                report["completed"], report["config"]["users"], report["elapsed_s"], report["throughput_rps"],
+                report["errors"], report["lambda_connections"])
+    latency = {name.removesuffix("_ms"): value for name, value in report["latency"].items() if name != "runs"}
+    logger.info("End-to-end latency ms: %s", ", ".join(f"{name} {value:.1f}" for name, value in latency.items()))
+    for step, summary in report["steps"].items():
+        logger.info("%-14s mean %8.1f ms  p95 <= %8.1f ms", step, summary["mean"] * 1000, summary["p95"] * 1000)
+    if report["first_error"]:
+        logger.warning("First error: %s", report["first_error"])
+
+
+def main():
+    """Parse arguments, run the load test and report the results."""
+    args = parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    # The fake endpoint does not check signatures, but botocore needs credentials to sign requests
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+
+    model = joblib.load(args.model) if args.model else synthetic_model()
+    uploads = [sample_upload(tuple(args.image_size), seed).getvalue() for seed in range(NUM_DISTINCT_UPLOADS)]
+    inference = fakes.load_module(fakes.INFERENCE_LAMBDA_PATH)
+    metrics = app_utils.InferenceMetrics()
+
+    with FakeLambdaServer(inference.lambda_handler, latency=args.lambda_latency) as server:
+        client = app_utils.create_lambda_client(endpoint_url=server.endpoint_url,
+                                                max_pool_connections=args.max_concurrency)
+        invoker = app_utils.LambdaInvoker(client, "local", max_concurrency=args.max_concurrency)
+        start = time.perf_counter()
+        latencies, errors = run_load(invoker, model, metrics, uploads, args.users, args.requests)
+        elapsed = time.perf_counter() - start
+        invoker.shutdown()
+
+    report = build_report(args, latencies, errors, elapsed, server.connections, metrics)
+    log_report(report)
+    if args.print_metrics:
+        print(metrics.render_prometheus())
+    if args.output:
+        write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Shared argument and output helpers of the benchmark scripts."""
+import argparse
+import json
+import logging
+import math
+import statistics
+
+logger = logging.getLogger(__name__)
+
+
+def write_report(report, path):
+    """Write a benchmark report as indented JSON and log where it was saved."""
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info("Report saved to %s", path)
+
+
+def positive_int(value):
+    """Parse a command line count that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def percentile(ordered, q):
+    """Return the q-quantile of an ascending list by the nearest-rank method, or NaN if it is empty."""
+    if not ordered:
+        return float("nan")
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(samples_ms, quantiles=(0.5, 0.95)):
+    """Summarize millisecond timings as their count, mean, nearest-rank percentiles and maximum."""
+    ordered = sorted(samples_ms)
+    summary = {"runs": len(ordered), "mean_ms": statistics.fmean(ordered) if ordered else float("nan")}
+    for q in quantiles:
+        summary[f"p{q * 100:g}_ms"] = percentile(ordered, q)
+    summary["max_ms"] = percentile(ordered, 1.0)
+    return summary
@@ -0,0 +1,183 @@
+"""End-to-end benchmark suite for the hot paths of the augmentation, training and inference code.
+
+Every stage runs on synthetic FER data against in-memory AWS fakes. Throughput is taken from the
+fastest of `--repeat` untraced runs; peak memory from one extra run under tracemalloc, which would
+otherwise slow down the timed runs. Results are written as JSON and, when a baseline is given,
+stages whose throughput dropped or whose peak memory grew by more than `--tolerance` are flagged.
+
+Usage:
+    python benchmarks/run_benchmarks.py --rows 1000 --output benchmark_results.json
+    python benchmarks/run_benchmarks.py --baseline benchmark_baseline.json
+    python benchmarks/run_benchmarks.py --output benchmark_baseline.json   # refresh the baseline
+"""
+import argparse
+import io
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+import fakes
+from report import positive_int, write_report
+from synthetic_fer import fer_csv
+
+sys.path.insert(0, str(fakes.REPO_ROOT / "pipeline" / "src"))
+
+# pylint: disable=wrong-import-position,wrong-import-order
+import pandas as pd
+import main as pipeline_main
+import model_evaluation as me
+import model_score as ms
+import train_model as tm
+import utils as app_utils
+from local_lambda import sample_image
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("benchmarks")
+
+SCORE_BATCH_SIZE = 256
+
+
+def measure(fn, repeat):
+    """Return the best wall time in seconds over `repeat` runs, the peak traced memory in MB and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2 ** 20, result
+
+
+def record(results, stage, items, fn, repeat):
+    """Benchmark one stage, store its metrics under `stage` and return the stage's result."""
+    seconds, peak_mem_mb, result = measure(fn, repeat)
+    results[stage] = {
+        "items": items,
+        "seconds": seconds,
+        "throughput_per_s": items / seconds if seconds else float("inf"),
+        "peak_mem_mb": peak_mem_mb,
+    }
+    logger.info("%-16s %8d items %9.3f s %12.1f items/s %9.1f MB peak",
+                stage, items, seconds, results[stage]["throughput_per_s"], peak_mem_mb)
+    return result
+
+
+def bench_augment_and_preprocess(results, rows, repeat):
+    """Benchmark the augmentation Lambda and preprocess_data; return the preprocessed features and labels."""
+    csv_text = fer_csv(rows)
+
+    augment = fakes.load_module(fakes.AUGMENT_LAMBDA_PATH)
+    s3_client = fakes.FakeS3Client({("raw", "train.csv"): csv_text.encode("utf-8")})
+    augment.get_s3_client = lambda: s3_client
+    event = fakes.s3_put_event("raw", "train.csv")
+    record(results, "augment_lambda", rows, lambda: augment.lambda_handler(event, None), repeat)
+
+    data = pd.read_csv(io.StringIO(csv_text))
+    return record(results, "preprocess_data", rows, lambda: pipeline_main.preprocess_data(data, "emotion"), repeat)
+
+
+def bench_train_and_score(results, x_data, y_data, repeat, output_dir):
+    """Benchmark training and both scoring modes; return the trained model."""
+    x_train, x_val, y_train, y_val = tm.split_data(x_data, y_data)
+    model = record(results, "train_model", len(x_train),
+                   lambda: tm.train_model(x_train, y_train, x_val, y_val, output_dir), repeat)
+
+    x_val_flat = x_val.values.reshape(x_val.shape[0], -1)
+    record(results, "score_model", len(x_val_flat), lambda: ms.score_model(model, x_val_flat, output_dir), repeat)
+
+    def score_chunked():
+        running_matrix = me.RunningConfusionMatrix()
+        batches = ms.iter_batches(x_val_flat, y_val.to_numpy(), SCORE_BATCH_SIZE)
+        return ms.score_model_chunked(model, batches, output_dir, metrics=running_matrix)
+
+    record(results, "score_chunked", len(x_val_flat), score_chunked, repeat)
+    return model
+
+
+def bench_inference(results, model, images, repeat):
+    """Benchmark the inference Lambda alone and the app's full predict path."""
+    inference = fakes.load_module(fakes.INFERENCE_LAMBDA_PATH)
+    events = [fakes.sample_image_event(seed=seed) for seed in range(images)]
+    record(results, "inference_lambda", images,
+           lambda: [inference.lambda_handler(image_event, None) for image_event in events], repeat)
+
+    invoker = app_utils.LambdaInvoker(fakes.FakeLambdaClient(inference.lambda_handler), "local")
+    metrics = app_utils.InferenceMetrics()
+    uploads = [sample_image(seed=seed) for seed in range(images)]
+
+    def predict_all():
+        return [app_utils.infer_emotion(upload, invoker, model, app_utils.EMOTION_LABELS, metrics)[1]
+                for upload in uploads]
+
+    record(results, "app_predict", images, predict_all, repeat)
+    invoker.shutdown()
+
+
+def run_suite(rows, images, repeat, output_dir):
+    """Run every stage and return a mapping of stage name to metrics."""
+    results = {}
+    x_data, y_data = bench_augment_and_preprocess(results, rows, repeat)
+    model = bench_train_and_score(results, x_data, y_data, repeat, output_dir)
+    bench_inference(results, model, images, repeat)
+    return results
+
+
+def find_regressions(results, baseline, tolerance):
+    """Return human readable descriptions of stages that regressed against the baseline."""
+    regressions = []
+    for stage, base in baseline.get("stages", {}).items():
+        current = results.get(stage)
+        if current is None:
+            continue
+        if current["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{stage}: throughput {current['throughput_per_s']:.1f}/s "
+                               f"vs baseline {base['throughput_per_s']:.1f}/s")
+        if current["peak_mem_mb"] > base["peak_mem_mb"] * (1 + tolerance):
+            regressions.append(f"{stage}: peak memory {current['peak_mem_mb']:.1f} MB "
+                               f"vs baseline {base['peak_mem_mb']:.1f} MB")
+    return regressions
+
+
+def main():
+    """Parse arguments, run the suite, write the report and exit non-zero on regressions."""
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark suite.")
+    parser.add_argument("--rows", type=positive_int, default=1000, help="Synthetic FER rows for the training stages")
+    parser.add_argument("--images", type=positive_int, default=50, help="Synthetic uploads for the inference stages")
+    parser.add_argument("--repeat", type=positive_int, default=1, help="Timed runs per stage; the fastest is kept")
+    parser.add_argument("--output", default="benchmark_results.json", help="Path of the JSON report")
+    parser.add_argument("--baseline", default=None, help="JSON report of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression, e.g. 0.2")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        results = run_suite(args.rows, args.images, args.repeat, Path(output_dir))
+
+    report = {"config": {"rows": args.rows, "images": args.images, "repeat": args.repeat}, "stages": results}
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            logger.warning("Baseline was recorded with %s, current run uses %s",
+                           baseline.get("config"), report["config"])
+        regressions = find_regressions(results, baseline, args.tolerance)
+        report["regressions"] = regressions
+
+    write_report(report, args.output)
+
+    for regression in regressions:
+        logger.error("Regression: %s", regression)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Generate synthetic data in the FER-2013 CSV format (`emotion`, `pixels` as 48x48 space separated values).
+
+Usage:
+    python benchmarks/synthetic_fer.py --rows 10000 --output synthetic_train.csv
+"""
+import argparse
+import csv
+import logging
+import random
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NUM_EMOTIONS = 7
+NUM_PIXELS = 48 * 48
+
+
+def fer_rows(num_rows, seed=42):
+    """Yield `(emotion, pixels)` tuples of random labels and grayscale pixel strings."""
+    rng = random.Random(seed)
+    for _ in range(num_rows):
+        pixels = " ".join(map(str, rng.randbytes(NUM_PIXELS)))
+        yield rng.randrange(NUM_EMOTIONS), pixels
+
+
+def fer_csv(num_rows, seed=42):
+    """Return a complete FER CSV document with `num_rows` rows as a string."""
+    lines = ["emotion,pixels"]
+    lines.extend(f"{emotion},{pixels}" for emotion, pixels in fer_rows(num_rows, seed))
+    return "\n".join(lines) + "\n"
+
+
+def write_fer_csv(path, num_rows, seed=42):
+    """Stream `num_rows` synthetic rows to a FER CSV file at `path`."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["emotion", "pixels"])
+        writer.writerows(fer_rows(num_rows, seed))
+    logger.info("Wrote %d synthetic FER rows to %s", num_rows, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic FER-format CSV.")
+    parser.add_argument("--rows", type=int, default=1000, help="Number of rows to generate")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible data")
+    parser.add_argument("--output", default="synthetic_fer.csv", help="Path of the CSV to write")
+    args = parser.parse_args()
+    write_fer_csv(args.output, args.rows, args.seed)
@@ -11,7 +11,6 @@ import train_model as tm
 import model_evaluation as me
 import model_score as ms
 
-logging.config.fileConfig("config/logging/local.conf")
 logger = logging.getLogger("pipeline")
 
 def preprocess_data(data, target_column):
@@ -48,10 +47,16 @@ def split_and_train_model(x_data, y_data, artifacts):
         sys.exit(1)
     return model, x_val, y_val
 
-def score_and_evaluate_model(model, x_val, y_val, artifacts):
-    """Score the model, evaluate its performance, and save the results."""
+def score_and_evaluate_model(model, x_val, y_val, artifacts, batch_size=None):
+    """Score the model, evaluate its performance, and save the results.
+
+    With a batch_size, predictions are made and evaluated in chunks of that many rows.
+    """
     try:
         x_val_flat = x_val.values.reshape(x_val.shape[0], -1)
+        if batch_size:
+            score_and_evaluate_model_chunked(model, x_val_flat, y_val.to_numpy(), artifacts, batch_size)
+            return
         scoring_results = ms.score_model(model, x_val_flat, artifacts)
         if scoring_results is None:
             logger.error("Model scoring failed. Exiting pipeline.")
@@ -70,6 +75,20 @@ def score_and_evaluate_model(model, x_val, y_val, artifacts):
         logger.error("OS error during model evaluation: %s", e)
         sys.exit(1)
 
+def score_and_evaluate_model_chunked(model, x_val_flat, y_val, artifacts, batch_size):
+    """Score the model in batches while accumulating a running confusion matrix, then save the results."""
+    running_matrix = me.RunningConfusionMatrix()
+    batches = ms.iter_batches(x_val_flat, y_val, batch_size)
+    scoring_results = ms.score_model_chunked(model, batches, artifacts, metrics=running_matrix)
+    if scoring_results is None:
+        logger.error("Model scoring failed. Exiting pipeline.")
+        sys.exit(1)
+    evaluation_results_path = artifacts / "evaluation_results.txt"
+    accuracy, _, _ = me.evaluate_running_confusion_matrix(running_matrix, evaluation_results_path)
+    if accuracy is None:
+        logger.error("Model evaluation failed. Exiting pipeline.")
+        sys.exit(1)
+
 def upload_artifacts_if_needed(artifacts, aws_config):
     """Upload artifacts to S3 if specified in the configuration."""
     if aws_config.get("upload", False):
@@ -114,12 +133,14 @@ def main(config_path):
     x_data, y_data = preprocess_data(data, run_config["target_column"])
 
     model, x_val, y_val = split_and_train_model(x_data, y_data, artifacts)
-    score_and_evaluate_model(model, x_val, y_val, artifacts)
+    score_and_evaluate_model(model, x_val, y_val, artifacts, run_config.get("score_batch_size"))
     upload_artifacts_if_needed(artifacts, aws_config)
 
     logger.info("Pipeline execution completed. All outputs saved in: %s", artifacts)
 
 if __name__ == "__main__":
+    # Configured here rather than at import so that importing this module does not truncate the pipeline log
+    logging.config.fileConfig("config/logging/local.conf")
     parser = argparse.ArgumentParser(description="Run the end-to-end pipeline.")
     parser.add_argument("--config", default="config/initial-config.yaml", help="Path to configuration file")
     args = parser.parse_args()
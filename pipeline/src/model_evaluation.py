@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
@@ -7,14 +8,109 @@ from sklearn.metrics import accuracy_score, classification_report, confusion_mat
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EMOTION_LABELS = ["Angry", "Disgust", "Fear", "Happy", "Sad", "Surprise", "Neutral"]
+
+class RunningConfusionMatrix:
+    """Confusion matrix accumulated batch by batch, from which the evaluation metrics are derived.
+
+    Rows are true classes and columns predicted classes, as in sklearn's confusion_matrix
+    with labels=range(num_classes). Classes without predictions or samples get a precision or
+    recall of 0, matching sklearn's default zero_division behaviour.
+    """
+
+    def __init__(self, num_classes=len(EMOTION_LABELS)):
+        self.num_classes = num_classes
+        self.matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
+
+    def update(self, y_true, y_pred):
+        """Add a batch of true labels and predictions to the matrix."""
+        y_true = np.asarray(y_true, dtype=np.int64).ravel()
+        y_pred = np.asarray(y_pred, dtype=np.int64).ravel()
+        if y_true.shape != y_pred.shape:
+            raise ValueError(f"Found {len(y_true)} labels but {len(y_pred)} predictions")
+        if y_true.size and (min(y_true.min(), y_pred.min()) < 0
+                            or max(y_true.max(), y_pred.max()) >= self.num_classes):
+            raise ValueError(f"Labels must be in the range [0, {self.num_classes})")
+        counts = np.bincount(y_true * self.num_classes + y_pred, minlength=self.num_classes ** 2)
+        self.matrix += counts.reshape(self.num_classes, self.num_classes)
+
+    @property
+    def support(self):
+        """Number of true samples per class."""
+        return self.matrix.sum(axis=1)
+
+    def accuracy(self):
+        """Fraction of correct predictions."""
+        total = self.matrix.sum()
+        if total == 0:
+            raise ValueError("Cannot compute accuracy without any samples")
+        return np.trace(self.matrix) / total
+
+    def precision(self):
+        """Per-class precision."""
+        return _safe_divide(np.diag(self.matrix), self.matrix.sum(axis=0))
+
+    def recall(self):
+        """Per-class recall."""
+        return _safe_divide(np.diag(self.matrix), self.support)
+
+    def f1_score(self):
+        """Per-class F1 score."""
+        precision, recall = self.precision(), self.recall()
+        return _safe_divide(2 * precision * recall, precision + recall)
+
+    def macro_average(self):
+        """Unweighted mean of the per-class precision, recall and F1 score."""
+        return self.precision().mean(), self.recall().mean(), self.f1_score().mean()
+
+    def weighted_average(self):
+        """Support-weighted mean of the per-class precision, recall and F1 score."""
+        weights = self.support
+        if weights.sum() == 0:
+            raise ValueError("Cannot compute weighted averages without any samples")
+        metrics = (self.precision(), self.recall(), self.f1_score())
+        return tuple(np.average(metric, weights=weights) for metric in metrics)
+
+    def report(self, target_names=None):
+        """Format a per-class precision/recall/F1 table in the layout of sklearn's classification_report."""
+        target_names = target_names or [str(label) for label in range(self.num_classes)]
+        width = max(len("weighted avg"), *(len(name) for name in target_names))
+        lines = [f"{'':>{width}} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}", ""]
+        for name, precision, recall, f1, support in zip(
+            target_names, self.precision(), self.recall(), self.f1_score(), self.support
+        ):
+            lines.append(f"{name:>{width}} {precision:>9.2f} {recall:>9.2f} {f1:>9.2f} {support:>9}")
+        lines.append("")
+        total = self.matrix.sum()
+        lines.append(f"{'accuracy':>{width}} {'':>9} {'':>9} {self.accuracy():>9.2f} {total:>9}")
+        for name, (precision, recall, f1) in (("macro avg", self.macro_average()),
+                                              ("weighted avg", self.weighted_average())):
+            lines.append(f"{name:>{width}} {precision:>9.2f} {recall:>9.2f} {f1:>9.2f} {total:>9}")
+        return "\n".join(lines) + "\n"
+
+def _safe_divide(numerator, denominator):
+    """Element-wise division that yields 0 where the denominator is 0."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+def _plot_confusion_matrix(conf_matrix, save_path):
+    """Plot the confusion matrix as a heatmap and save it."""
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(conf_matrix, annot=True, fmt="d", cmap="Blues",
+                xticklabels=EMOTION_LABELS, yticklabels=EMOTION_LABELS)
+    plt.xlabel("Predicted")
+    plt.ylabel("True")
+    plt.title("Confusion Matrix")
+    plt.savefig(save_path)
+    plt.close()
+
 def evaluate_model(y_val, val_predictions, evaluation_results_path):
     """Evaluate the trained model's performance and save the results."""
     try:
         # Calculate performance metrics
         accuracy = accuracy_score(y_val, val_predictions)
-        class_report = classification_report(y_val, val_predictions, target_names=[
-            "Angry", "Disgust", "Fear", "Happy", "Sad", "Surprise", "Neutral"
-        ])
+        class_report = classification_report(y_val, val_predictions, target_names=EMOTION_LABELS)
         conf_matrix = confusion_matrix(y_val, val_predictions)
 
         # Print performance metrics
@@ -28,17 +124,31 @@ def evaluate_model(y_val, val_predictions, evaluation_results_path):
             file.write("Confusion Matrix:\n" + str(conf_matrix) + "\n")
 
         # Plot confusion matrix
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(conf_matrix, annot=True, fmt="d", cmap="Blues", xticklabels=[
-            "Angry", "Disgust", "Fear", "Happy", "Sad", "Surprise", "Neutral"
-        ], yticklabels=[
-            "Angry", "Disgust", "Fear", "Happy", "Sad", "Surprise", "Neutral"
-        ])
-        plt.xlabel("Predicted")
-        plt.ylabel("True")
-        plt.title("Confusion Matrix")
-        plt.savefig(evaluation_results_path.parent / "confusion_matrix.png")
-        plt.close()
+        _plot_confusion_matrix(conf_matrix, evaluation_results_path.parent / "confusion_matrix.png")
+
+        logger.info("Model evaluation completed successfully.")
+        return accuracy, class_report, conf_matrix
+
+    except ValueError as e:
+        logger.error("Value error during model evaluation: %s", e)
+        return None, None, None
+
+def evaluate_running_confusion_matrix(running_matrix, evaluation_results_path):
+    """Save the evaluation results derived from a RunningConfusionMatrix filled during chunked scoring."""
+    try:
+        accuracy = running_matrix.accuracy()
+        class_report = running_matrix.report(target_names=EMOTION_LABELS)
+        conf_matrix = running_matrix.matrix
+
+        logger.info("Validation Accuracy: %.4f", accuracy)
+        logger.info("Classification Report:\n%s", class_report)
+
+        with open(evaluation_results_path, "w") as file:
+            file.write(f"Validation Accuracy: {accuracy:.4f}\n")
+            file.write("Classification Report:\n" + class_report + "\n")
+            file.write("Confusion Matrix:\n" + str(conf_matrix) + "\n")
+
+        _plot_confusion_matrix(conf_matrix, evaluation_results_path.parent / "confusion_matrix.png")
 
         logger.info("Model evaluation completed successfully.")
         return accuracy, class_report, conf_matrix
@@ -1,9 +1,12 @@
 import logging
+import numpy as np
 import pandas as pd
 
 # Set up logging configuration
 logger = logging.getLogger(__name__)
 
+PREDICTIONS_DTYPE = np.dtype(np.int64)
+
 def score_model(model, x_val_flat, output_dir):
     """Score the trained model on the validation set and save predictions to a CSV file."""
     try:
@@ -22,3 +25,39 @@ def score_model(model, x_val_flat, output_dir):
     except FileNotFoundError as e:
         logger.error("Output directory not found: %s", e)
         return None
+
+def iter_batches(x_data, y_data=None, batch_size=1024):
+    """Yield (features, labels) batches of at most batch_size rows; labels are None without y_data."""
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    for start in range(0, len(x_data), batch_size):
+        y_batch = None if y_data is None else y_data[start:start + batch_size]
+        yield x_data[start:start + batch_size], y_batch
+
+def score_model_chunked(model, batches, output_dir, metrics=None):
+    """Score the model batch by batch, appending predictions to a binary file.
+
+    Memory use is bounded by the batch size. `batches` yields (features, labels) pairs, as produced
+    by `iter_batches`; when labels are present and `metrics` is given, `metrics.update(labels, predictions)`
+    is called for every batch, e.g. with a running confusion matrix.
+    """
+    predictions_path = output_dir / "model_scoring.bin"
+    num_predictions = 0
+    try:
+        with open(predictions_path, "wb") as file:
+            for x_batch, y_batch in batches:
+                batch_predictions = np.asarray(model.predict(x_batch), dtype=PREDICTIONS_DTYPE)
+                batch_predictions.tofile(file)
+                num_predictions += len(batch_predictions)
+                if metrics is not None and y_batch is not None:
+                    metrics.update(y_batch, batch_predictions)
+        logger.info("Model scoring completed successfully on %d rows.", num_predictions)
+        logger.info("Model scoring artifacts saved to %s", predictions_path)
+        return {"predictions_path": predictions_path, "num_predictions": num_predictions}
+    except FileNotFoundError as e:
+        logger.error("Output directory not found: %s", e)
+        return None
+
+def read_predictions(predictions_path):
+    """Memory-map the predictions written by score_model_chunked."""
+    return np.memmap(predictions_path, dtype=PREDICTIONS_DTYPE, mode="r")
@@ -2,7 +2,9 @@ import unittest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import numpy as np
-from src.model_evaluation import evaluate_model
+from sklearn.metrics import (accuracy_score, confusion_matrix, precision_recall_fscore_support,
+                             precision_score, recall_score)
+from src.model_evaluation import RunningConfusionMatrix, evaluate_model, evaluate_running_confusion_matrix
 
 class TestEvaluateModel(unittest.TestCase):
     """
@@ -66,5 +68,119 @@ class TestEvaluateModel(unittest.TestCase):
             self.assertIsNone(conf_matrix)
             self.assertRaises(ValueError)
 
+class TestRunningConfusionMatrix(unittest.TestCase):
+    """
+    Test suite for RunningConfusionMatrix and evaluate_running_confusion_matrix.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Setup reusable assets for all tests."""
+        rng = np.random.default_rng(42)
+        cls.y_val = rng.integers(0, 7, size=1000)
+        cls.val_predictions = np.where(rng.random(1000) < 0.6, cls.y_val, rng.integers(0, 7, size=1000))
+        # Zero division fixture: class 6 has samples but no predictions, class 0 has predictions
+        # but no samples, and class 2 has neither
+        cls.sparse_y_val = np.where(np.isin(cls.y_val, (0, 2)), 1, cls.y_val)
+        cls.sparse_predictions = cls.val_predictions.copy()
+        cls.sparse_predictions[cls.sparse_predictions == 6] = 5
+        cls.sparse_predictions[cls.sparse_predictions == 2] = 3
+        cls.evaluation_results_path = Path("test_output/evaluation_results.txt")
+        cls.evaluation_results_path.parent.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests."""
+        if cls.evaluation_results_path.exists():
+            cls.evaluation_results_path.unlink()
+        if cls.evaluation_results_path.parent.exists():
+            cls.evaluation_results_path.parent.rmdir()
+
+    def test_batched_updates_match_sklearn(self):
+        """Test that metrics accumulated over batches match sklearn on the full arrays."""
+        running_matrix = RunningConfusionMatrix()
+        for start in range(0, len(self.y_val), 64):
+            running_matrix.update(self.y_val[start:start + 64], self.val_predictions[start:start + 64])
+
+        labels = list(range(7))
+        np.testing.assert_array_equal(
+            running_matrix.matrix, confusion_matrix(self.y_val, self.val_predictions, labels=labels)
+        )
+        self.assertAlmostEqual(running_matrix.accuracy(), accuracy_score(self.y_val, self.val_predictions))
+        np.testing.assert_allclose(
+            running_matrix.precision(),
+            precision_score(self.y_val, self.val_predictions, labels=labels, average=None, zero_division=0)
+        )
+        np.testing.assert_allclose(
+            running_matrix.recall(),
+            recall_score(self.y_val, self.val_predictions, labels=labels, average=None, zero_division=0)
+        )
+
+    def test_zero_division_matches_sklearn(self):
+        """Test that classes without predictions or without samples get sklearn's zero_division=0 scores."""
+        running_matrix = RunningConfusionMatrix()
+        running_matrix.update(self.sparse_y_val, self.sparse_predictions)
+        self.assertEqual(running_matrix.matrix[:, 6].sum(), 0)
+        self.assertEqual(running_matrix.support[0], 0)
+        self.assertEqual(running_matrix.matrix[2].sum() + running_matrix.matrix[:, 2].sum(), 0)
+
+        labels = list(range(7))
+        precision, recall, f1, support = precision_recall_fscore_support(
+            self.sparse_y_val, self.sparse_predictions, labels=labels, average=None, zero_division=0
+        )
+        np.testing.assert_allclose(running_matrix.precision(), precision)
+        np.testing.assert_allclose(running_matrix.recall(), recall)
+        np.testing.assert_allclose(running_matrix.f1_score(), f1)
+        np.testing.assert_array_equal(running_matrix.support, support)
+        for average, result in (("macro", running_matrix.macro_average()),
+                                ("weighted", running_matrix.weighted_average())):
+            expected = precision_recall_fscore_support(
+                self.sparse_y_val, self.sparse_predictions, labels=labels, average=average, zero_division=0
+            )
+            np.testing.assert_allclose(result, expected[:3])
+
+    def test_averages_match_sklearn(self):
+        """Test that the macro and weighted averages match sklearn's."""
+        running_matrix = RunningConfusionMatrix()
+        running_matrix.update(self.y_val, self.val_predictions)
+        for average, result in (("macro", running_matrix.macro_average()),
+                                ("weighted", running_matrix.weighted_average())):
+            expected = precision_recall_fscore_support(
+                self.y_val, self.val_predictions, labels=list(range(7)), average=average, zero_division=0
+            )
+            np.testing.assert_allclose(result, expected[:3])
+        report = running_matrix.report()
+        self.assertIn("macro avg", report)
+        self.assertIn("weighted avg", report)
+
+    def test_update_rejects_invalid_labels(self):
+        """Test that update raises ValueError on mismatched or out of range labels."""
+        running_matrix = RunningConfusionMatrix()
+        with self.assertRaises(ValueError):
+            running_matrix.update([0, 1], [0])
+        with self.assertRaises(ValueError):
+            running_matrix.update([0, 7], [0, 1])
+
+    @patch("src.model_evaluation.plt.savefig")
+    def test_evaluate_running_confusion_matrix(self, mock_savefig):
+        """Test that results are saved from a filled running confusion matrix."""
+        running_matrix = RunningConfusionMatrix()
+        running_matrix.update(self.y_val, self.val_predictions)
+        accuracy, class_report, _ = evaluate_running_confusion_matrix(
+            running_matrix, self.evaluation_results_path
+        )
+        self.assertAlmostEqual(accuracy, accuracy_score(self.y_val, self.val_predictions))
+        self.assertIn("Neutral", class_report)
+        self.assertTrue(self.evaluation_results_path.exists())
+        mock_savefig.assert_called_once()
+
+    def test_evaluate_running_confusion_matrix_empty(self):
+        """Test that an empty running confusion matrix is handled like empty test data."""
+        accuracy, class_report, conf_matrix = evaluate_running_confusion_matrix(
+            RunningConfusionMatrix(), self.evaluation_results_path
+        )
+        self.assertIsNone(accuracy)
+        self.assertIsNone(class_report)
+        self.assertIsNone(conf_matrix)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from pathlib import Path
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from src.model_evaluation import RunningConfusionMatrix
+from src.model_score import iter_batches, read_predictions, score_model, score_model_chunked
+
+class TestScoreModel(unittest.TestCase):
+    """
+    Test suite for score_model and score_model_chunked functions.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Setup reusable assets for all tests."""
+        cls.x_data, cls.y_data = make_classification(
+            n_samples=250, n_features=20, n_informative=8, n_classes=7, random_state=42
+        )
+        cls.model = RandomForestClassifier(n_estimators=10, random_state=42).fit(cls.x_data, cls.y_data)
+        cls.output_dir = Path("test_output")
+
+    def setUp(self):
+        """Create the output directory before each test."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        """Clean up after each test."""
+        if self.output_dir.exists() and self.output_dir.is_dir():
+            for file in self.output_dir.iterdir():
+                file.unlink()
+            self.output_dir.rmdir()
+
+    def test_score_model_happy_path(self):
+        """Test that score_model saves all predictions to a CSV file."""
+        model_scoring = score_model(self.model, self.x_data, self.output_dir)
+        self.assertEqual(len(model_scoring), len(self.x_data))
+        self.assertTrue((self.output_dir / "model_scoring.csv").exists())
+
+    def test_score_model_chunked_matches_score_model(self):
+        """Test that chunked scoring writes the same predictions and fills the running metrics."""
+        running_matrix = RunningConfusionMatrix()
+        batches = iter_batches(self.x_data, self.y_data, batch_size=32)
+        scoring_results = score_model_chunked(self.model, batches, self.output_dir, metrics=running_matrix)
+
+        expected = self.model.predict(self.x_data)
+        self.assertEqual(scoring_results["num_predictions"], len(expected))
+        np.testing.assert_array_equal(read_predictions(scoring_results["predictions_path"]), expected)
+        self.assertEqual(running_matrix.matrix.sum(), len(expected))
+        self.assertAlmostEqual(running_matrix.accuracy(), np.mean(expected == self.y_data))
+
+    def test_score_model_chunked_missing_output_dir(self):
+        """Test that score_model_chunked handles a missing output directory."""
+        batches = iter_batches(self.x_data, batch_size=32)
+        self.assertIsNone(score_model_chunked(self.model, batches, self.output_dir / "missing"))
+
+    def test_iter_batches_invalid_batch_size(self):
+        """Test that iter_batches rejects a non-positive batch size."""
+        with self.assertRaises(ValueError):
+            next(iter_batches(self.x_data, batch_size=0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,21 @@
 import os
 import csv
 import io
-import boto3
-import numpy as np
 from PIL import Image, ImageOps
 
-s3 = boto3.client('s3')
+IMAGE_SIZE = (48, 48)
+
+# Created on first use and reused by warm invocations of the same container
+_s3_client = None
+
+
+def get_s3_client():
+    '''Return the shared S3 client, creating it on first use'''
+    global _s3_client  # pylint: disable=global-statement
+    if _s3_client is None:
+        import boto3  # pylint: disable=import-outside-toplevel
+        _s3_client = boto3.client('s3')
+    return _s3_client
 
 # Data augmentation function
 def augment_image(image):
@@ -19,6 +29,7 @@ def augment_image(image):
 # Lambda handler
 def lambda_handler(event, context):
     '''Read in image csv from S3 and augmented images csv to S3'''
+    s3 = get_s3_client()
     source_bucket = event['Records'][0]['s3']['bucket']['name']
     source_key = event['Records'][0]['s3']['object']['key']
     dest_bucket = 'udn3315-test-0'
@@ -40,19 +51,19 @@ def lambda_handler(event, context):
         pixels_str = row['pixels'].strip()
 
         try:
-            pixels = list(map(int, pixels_str.split()))
+            pixels = bytes(map(int, pixels_str.split()))
+            if len(pixels) != IMAGE_SIZE[0] * IMAGE_SIZE[1]:
+                raise ValueError(f'expected {IMAGE_SIZE[0] * IMAGE_SIZE[1]} pixels, got {len(pixels)}')
+            image = Image.frombytes('L', IMAGE_SIZE, pixels)
         except ValueError:
             # If there's an issue with converting pixels, log and skip the row
             print(f"Skipping invalid row: {row}")
             continue
 
-        image = Image.fromarray(np.array(pixels).reshape(48, 48).astype('uint8'))
-
         augmented_images = augment_image(image)
 
         for aug_image in augmented_images:
-            aug_pixels = np.array(aug_image).flatten()
-            aug_pixels_str = ' '.join(map(str, aug_pixels))
+            aug_pixels_str = ' '.join(map(str, aug_image.tobytes()))
             writer.writerow([emotion, aug_pixels_str])
 
     # Upload the augmented data to the destination S3 bucket
@@ -3,7 +3,6 @@ import json
 import base64
 from io import BytesIO
 from typing import Tuple, Dict, Any
-import numpy as np
 from PIL import Image
 
 def resize_image(image: Image.Image, target_size: Tuple[int, int] = (48, 48)) -> Image.Image:
@@ -45,11 +44,8 @@ def lambda_handler(event: Dict[str, Any], _context: Any) -> Dict[str, Any]:
         image = Image.open(BytesIO(image_data)).convert('L')
         # Resize the image to (48, 48) without distortion
         image = resize_image(image, target_size=(48, 48))
-        # Convert the image to a numpy array and reshape to (48, 48, 1)
-        image_array = np.array(image).reshape((48, 48, 1))
-        # Convert the numpy array back to base64
+        # Encode the grayscale image back to base64 PNG
         buffered = BytesIO()
-        image = Image.fromarray(image_array.squeeze(), 'L')
         image.save(buffered, format='PNG')
         standardized_image_data = base64.b64encode(buffered.getvalue()).decode('utf-8')
         return {